@@ -2879,8 +2879,8 @@ class OrderChangeManager:
             )
 
     def _reissue_invoice(self):
-        i = self.order.invoices.filter(is_cancellation=False).last()
         if self.reissue_invoice and self._invoice_dirty:
+            i = self.order.invoices.filter(is_cancellation=False).last()
             order_now_qualified = invoice_qualified(self.order)
             invoice_should_be_generated_now = (
                 self.event.settings.invoice_generate == "True" or (
@@ -0,0 +1,92 @@
+#
+# This file is part of pretix (Community Edition).
+#
+# Copyright (C) 2014-2020  Raphael Michel and contributors
+# Copyright (C) 2020-today pretix GmbH and contributors
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General
+# Public License as published by the Free Software Foundation in version 3 of the License.
+#
+# ADDITIONAL TERMS APPLY: Pursuant to Section 7 of the GNU Affero General Public License, additional terms are
+# applicable granting you additional permissions and placing additional restrictions on your usage of this software.
+# Please refer to the pretix LICENSE file to obtain the full terms applicable to this work. If you did not receive
+# this file, see <https://pretix.eu/about/en/license>.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Affero General Public License along with this program.  If not, see
+# <https://www.gnu.org/licenses/>.
+#
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.db import transaction
+from django_scopes import scopes_disabled
+
+from pretix.base.models import Event, Item, Organizer, Quota
+
+
+@pytest.fixture(scope='module')
+def module_transaction(django_db_setup, django_db_blocker):
+    """
+    Opens a database transaction that is kept open for all tests of a module and rolled back afterwards. Module-scoped
+    fixtures that create database objects need to depend on this, the tests themselves still run in their own
+    transactions nested inside of it.
+    """
+    with django_db_blocker.unblock(), transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+@pytest.fixture(scope='module')
+def module_scopes_disabled():
+    """
+    Disables django-scopes for all tests of a module, instead of once per test. Only use this in modules that do not
+    test anything related to scoping.
+    """
+    with scopes_disabled():
+        yield
+
+
+@pytest.fixture(scope='module')
+@scopes_disabled()
+def organizer(module_transaction):
+    return Organizer.objects.create(name='TestOrga', slug='testorga', plugins='pretix.plugins.banktransfer')
+
+
+@pytest.fixture(scope='module')
+@scopes_disabled()
+def web_channel(organizer):
+    return organizer.sales_channels.get(identifier="web")
+
+
+@pytest.fixture(scope='module')
+@scopes_disabled()
+def event(organizer):
+    return Event.objects.create(
+        organizer=organizer, name='Test Event', slug='testevent',
+        date_from=datetime.datetime(2024, 12, 26, tzinfo=datetime.timezone.utc),
+        plugins='pretix.plugins.banktransfer',
+        live=True
+    )
+
+
+@pytest.fixture(scope='module')
+@scopes_disabled()
+def quota(event):
+    return Quota.objects.create(event=event, name='Test Quota', size=100)
+
+
+@pytest.fixture(scope='module')
+@scopes_disabled()
+def free_ticket(event, quota):
+    category = event.categories.create(name='Tickets', position=0)
+    item = Item.objects.create(
+        event=event, name='Free Ticket', category=category,
+        default_price=Decimal('0.00'), admission=True
+    )
+    quota.items.add(item)
+    return item
@@ -33,214 +33,119 @@ import datetime
 from decimal import Decimal
 
 import pytest
-from django.test import TestCase
-from django.utils.timezone import now
-from django_scopes import scopes_disabled
-
-from pretix.base.models import (
-    Event, Item, ItemCategory, Order, OrderPosition, Organizer, Quota,
-)
-from pretix.base.models.orders import OrderPayment
+
+from pretix.base.models import Order, OrderPosition, generate_secret
 from pretix.base.services.orders import OrderChangeManager, OrderError
 
+ZERO = Decimal('0.00')
+ORDER_DATETIME = datetime.datetime(2024, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def order(event, web_channel):
+    # Create a free order, free orders are immediately paid
+    return Order.objects.create(
+        status=Order.STATUS_PAID,
+        event=event,
+        email='test@example.com',
+        datetime=ORDER_DATETIME - datetime.timedelta(days=1),
+        expires=ORDER_DATETIME + datetime.timedelta(days=30),
+        total=ZERO,
+        sales_channel=web_channel,
+        locale='en'
+    )
+
+
+@pytest.fixture
+def positions(order, free_ticket):
+    # Both positions are inserted in one query. bulk_create() bypasses OrderPosition.save(), so all fields that save()
+    # would fill in automatically need to be set here.
+    return OrderPosition.objects.bulk_create([
+        OrderPosition(
+            order=order,
+            organizer=order.event.organizer,
+            positionid=positionid,
+            item=free_ticket,
+            variation=None,
+            price=ZERO,
+            tax_rate=ZERO,
+            tax_value=ZERO,
+            secret=generate_secret(),
+            pseudonymization_id=generate_secret(),
+            attendee_name_parts={'full_name': name}
+        )
+        for positionid, name in ((1, 'Alice'), (2, 'Bob'))
+    ])
+
 
-class PartialCancelFreeOrderTest(TestCase):
+@pytest.mark.django_db
+@pytest.mark.usefixtures("module_scopes_disabled")
+class TestPartialCancelFreeOrder:
     """
     Test partial cancellation of free orders with multiple positions.
 
     This test creates a free order (total = 0) with two order positions,
-    then attempts to cancel only one position via the OrderChangeManager.
+    then attempts to cancel one or both positions via the OrderChangeManager.
     The expected outcome is that:
-    - One position remains active
-    - One position is marked as canceled
-    - The order itself remains valid
+    - Canceling one position marks only that position as canceled
+    - The other position remains active
+    - The order itself remains valid and keeps its status
+    - Canceling all positions is refused, the order itself needs to be
+      canceled instead
+
+    The event, quota and product are shared by all tests of this module,
+    see ``tests/presale/conftest.py``. django-scopes is disabled for the
+    whole module as well.
     """
 
-    @scopes_disabled()
-    def setUp(self):
-        super().setUp()
-        self.orga = Organizer.objects.create(
-            name='TestOrga',
-            slug='testorga',
-            plugins='pretix.plugins.banktransfer'
-        )
-        self.event = Event.objects.create(
-            organizer=self.orga,
-            name='Test Event',
-            slug='testevent',
-            date_from=datetime.datetime(2024, 12, 26, tzinfo=datetime.timezone.utc),
-            plugins='pretix.plugins.banktransfer',
-            live=True
-        )
-        self.event.settings.set('payment_banktransfer__enabled', True)
-
-        self.category = ItemCategory.objects.create(
-            event=self.event,
-            name="Tickets",
-            position=0
-        )
-        self.quota = Quota.objects.create(
-            event=self.event,
-            name='Test Quota',
-            size=100
-        )
-        # Create a free ticket item (price = 0)
-        self.free_ticket = Item.objects.create(
-            event=self.event,
-            name='Free Ticket',
-            category=self.category,
-            default_price=Decimal('0.00'),
-            admission=True
-        )
-        self.quota.items.add(self.free_ticket)
-
-        # Create a free order with two positions
-        self.order = Order.objects.create(
-            status=Order.STATUS_PAID,  # Free orders are immediately paid
-            event=self.event,
-            email='test@example.com',
-            datetime=now() - datetime.timedelta(days=1),
-            expires=now() + datetime.timedelta(days=30),
-            total=Decimal('0.00'),
-            sales_channel=self.orga.sales_channels.get(identifier="web"),
-            locale='en'
-        )
-        # Create first order position
-        self.position1 = OrderPosition.objects.create(
-            order=self.order,
-            item=self.free_ticket,
-            variation=None,
-            price=Decimal('0.00'),
-            attendee_name_parts={'full_name': 'Alice'}
-        )
-        # Create second order position
-        self.position2 = OrderPosition.objects.create(
-            order=self.order,
-            item=self.free_ticket,
-            variation=None,
-            price=Decimal('0.00'),
-            attendee_name_parts={'full_name': 'Bob'}
-        )
-        # Mark order as paid with a free payment
-        OrderPayment.objects.create(
-            order=self.order,
-            provider='free',
-            amount=Decimal('0.00'),
-            state=OrderPayment.PAYMENT_STATE_CONFIRMED
+    @pytest.mark.parametrize("cancel_ids,should_raise,remaining_name", [
+        ([0], False, 'Bob'),
+        ([1], False, 'Alice'),
+        ([0, 1], True, None),
+    ])
+    def test_partial_cancel(self, order, positions, cancel_ids, should_raise, remaining_name):
+        # Verify initial state
+        assert order.status == Order.STATUS_PAID
+        assert order.total == ZERO
+        assert order.positions.filter(canceled=False).count() == 2
+
+        ocm = OrderChangeManager(
+            order=order,
+            notify=False,
+            reissue_invoice=False,
         )
+        for i in cancel_ids:
+            ocm.cancel(positions[i])
 
-    def test_partial_cancel_free_order_one_position(self):
-        """
-        Test canceling one position of a free order with two positions.
-
-        This test verifies that:
-        1. A free order with two positions can have one position canceled
-        2. After partial cancellation, the remaining position is still active
-        3. The canceled position is marked as canceled
-        4. The order remains in a valid state
-        """
-        with scopes_disabled():
-            # Verify initial state
-            assert self.order.status == Order.STATUS_PAID
-            assert self.order.total == Decimal('0.00')
-            assert self.order.positions.filter(canceled=False).count() == 2
-
-            # Create OrderChangeManager to perform partial cancellation
-            ocm = OrderChangeManager(
-                order=self.order,
-                notify=False,
-                reissue_invoice=False,
-            )
-
-            # Cancel only the first position
-            ocm.cancel(self.position1)
+        if should_raise:
+            # The OrderChangeManager does not allow to leave the order empty
+            with pytest.raises(OrderError) as exc_info:
+                ocm.commit()
+            assert str(exc_info.value) == str(OrderChangeManager.error_messages['complete_cancel']), \
+                "Error should indicate that complete cancellation via positions is not allowed"
+        else:
             ocm.commit()
 
-            # Refresh from database
-            self.order.refresh_from_db()
-            self.position1.refresh_from_db()
-            self.position2.refresh_from_db()
+        # Refresh from database, the order is loaded along with the positions
+        refreshed = OrderPosition.all.select_related('order').in_bulk([p.pk for p in positions])
+        positions = [refreshed[p.pk] for p in positions]
+        order = positions[0].order
 
-            # Assert that position1 is canceled
-            assert self.position1.canceled, \
-                "Position 1 should be marked as canceled"
+        for i, p in enumerate(positions):
+            if i in cancel_ids and not should_raise:
+                assert p.canceled, f"Position {i + 1} should be marked as canceled"
+            else:
+                assert not p.canceled, f"Position {i + 1} should remain active"
 
-            # Assert that position2 is still active
-            assert not self.position2.canceled, \
-                "Position 2 should remain active"
-
-            # Assert the order still has one active position
-            active_positions = self.order.positions.filter(canceled=False)
-            assert active_positions.count() == 1, \
+        if not should_raise:
+            active_positions = list(order.positions.filter(canceled=False))
+            assert len(active_positions) == 1, \
                 "Order should have exactly one active position after partial cancel"
-            assert active_positions.first().attendee_name == 'Bob', \
-                "The remaining active position should be Bob's ticket"
-
-            # Assert the order total remains 0
-            assert self.order.total == Decimal('0.00'), \
-                "Order total should remain 0 for free order"
-
-    def test_partial_cancel_preserves_order_status(self):
-        """
-        Test that partial cancellation of a free order preserves order status.
-
-        For a paid free order, partially canceling positions should not change
-        the order status if there are still active positions remaining.
-        """
-        with scopes_disabled():
-            original_status = self.order.status
-
-            ocm = OrderChangeManager(
-                order=self.order,
-                notify=False,
-                reissue_invoice=False,
-            )
-
-            # Cancel only position2 this time
-            ocm.cancel(self.position2)
-            ocm.commit()
-
-            self.order.refresh_from_db()
-
-            # Order should still be paid as there's still one active position
-            assert self.order.status == original_status, \
-                f"Order status should remain {original_status} after partial cancel"
-
-            # Verify the correct position is canceled
-            self.position2.refresh_from_db()
-            assert self.position2.canceled
-
-    def test_cancel_all_positions_raises_error(self):
-        """
-        Test that attempting to cancel all positions raises an error.
-
-        The OrderChangeManager should not allow canceling all positions
-        of an order. If all positions need to be canceled, the order
-        itself should be canceled instead.
-        """
-        with scopes_disabled():
-            ocm = OrderChangeManager(
-                order=self.order,
-                notify=False,
-                reissue_invoice=False,
-            )
-
-            # Cancel both positions
-            ocm.cancel(self.position1)
-            ocm.cancel(self.position2)
-
-            # Attempting to commit should raise an OrderError
-            with pytest.raises(OrderError) as exc_info:
-                ocm.commit()
-
-            # Verify the error message indicates complete cancel is not allowed
-            assert "empty" in str(exc_info.value).lower() or "cancel" in str(exc_info.value).lower(), \
-                "Error should indicate that complete cancellation via positions is not allowed"
-
-            # Verify positions were not actually canceled
-            self.position1.refresh_from_db()
-            self.position2.refresh_from_db()
-            assert not self.position1.canceled, \
-                "Position 1 should not be canceled after failed commit"
-            assert not self.position2.canceled, \
-                "Position 2 should not be canceled after failed commit"
+            assert active_positions[0].attendee_name == remaining_name, \
+                f"The remaining active position should be {remaining_name}'s ticket"
+
+        # The order stays paid and free as there's still at least one active position
+        assert order.status == Order.STATUS_PAID, \
+            "Order status should remain paid after partial cancel"
+        assert order.total == ZERO, \
+            "Order total should remain 0 for free order"